@@ -1,12 +1,15 @@
 """
-bitcoin_rpc.py — Thin wrapper around bitcoin-cli for Python tests.
+bitcoin_rpc.py — Thin JSON-RPC client for bitcoind, used by the Python scripts.
 Connection settings are read from config.ini in the same directory.
 """
 
 import json
-import subprocess
 import os
+import base64
+import threading
 import configparser
+import http.client
+import urllib.parse
 
 # ── Load config ──────────────────────────────────────────────────────────────
 
@@ -16,73 +19,222 @@ def _load_config():
     cfg.read(config_path)
     return cfg["bitcoin"] if "bitcoin" in cfg else {}
 
-def _build_base_args(section):
-    cli_bin = section.get("cli", "bitcoin-cli")
-    network = section.get("network", "regtest").strip().lower()
-
-    args = [cli_bin]
-
-    # Datadir — resolve relative paths from this file's directory
+def _resolve_datadir(section):
+    """Datadir from config, with relative paths resolved from this file's directory."""
     datadir = section.get("datadir", "").strip()
-    if datadir:
-        if not os.path.isabs(datadir):
-            datadir = os.path.join(os.path.dirname(os.path.abspath(__file__)), datadir)
-        args.append(f"-datadir={datadir}")
-
-    network_flags = {
-        "regtest": "-regtest",
-        "testnet": "-testnet",
-        "signet":  "-signet",
-    }
-    if network in network_flags:
-        args.append(network_flags[network])
-
-    for key, flag in [("rpchost", "-rpcconnect"), ("rpcport", "-rpcport"),
-                      ("rpcuser", "-rpcuser"), ("rpcpassword", "-rpcpassword")]:
-        value = section.get(key, "").strip()
-        if value:
-            args.append(f"{flag}={value}")
-
-    return args
+    if datadir and not os.path.isabs(datadir):
+        datadir = os.path.join(os.path.dirname(os.path.abspath(__file__)), datadir)
+    return datadir
+
+# network -> (default RPC port, datadir subdirectory holding .cookie, bitcoin.conf section)
+_RPC_DEFAULTS = {
+    "mainnet": (8332, "", "main"),
+    "testnet": (18332, "testnet3", "test"),
+    "signet":  (38332, "signet", "signet"),
+    "regtest": (18443, "regtest", "regtest"),
+}
+
+def _read_bitcoin_conf(datadir, conf_section):
+    """RPC settings from <datadir>/bitcoin.conf: the network's section over the global one.
+
+    As in bitcoind, a global rpcport only applies to mainnet; other networks
+    must set it in their own [section].
+    """
+    conf = configparser.ConfigParser(strict=False, interpolation=None, inline_comment_prefixes=("#",))
+    try:
+        with open(os.path.join(datadir, "bitcoin.conf")) as f:
+            conf.read_string("[__global__]\n" + f.read())
+    except (OSError, configparser.Error):
+        return {}
+    keys = ("rpcconnect", "rpcport", "rpcuser", "rpcpassword", "rpccookiefile")
+    settings = {k: v.strip() for k, v in conf["__global__"].items() if k in keys}
+    if conf_section != "main":
+        settings.pop("rpcport", None)
+    if conf.has_section(conf_section):
+        settings.update((k, v.strip()) for k, v in conf[conf_section].items() if k in keys)
+    return settings
+
+def _build_rpc_endpoint(section):
+    """Resolve JSON-RPC host, port and auth like bitcoin-cli: config.ini, then bitcoin.conf, then defaults."""
+    network = section.get("network", "regtest").strip().lower()
+    port, subdir, conf_section = _RPC_DEFAULTS.get(network, _RPC_DEFAULTS["mainnet"])
+    datadir = _resolve_datadir(section) or os.path.expanduser("~/.bitcoin")
+    conf = _read_bitcoin_conf(datadir, conf_section)
+
+    host = section.get("rpchost", "").strip() or conf.get("rpcconnect") or "127.0.0.1"
+    if host.count(":") == 1:  # rpcconnect=host:port
+        host, _, conf_port = host.partition(":")
+        conf.setdefault("rpcport", conf_port)
+    port = int(section.get("rpcport", "").strip() or conf.get("rpcport") or port)
+    user = section.get("rpcuser", "").strip() or conf.get("rpcuser", "")
+    password = section.get("rpcpassword", "").strip() or conf.get("rpcpassword", "")
+    cookie = conf.get("rpccookiefile") or ".cookie"
+    if not os.path.isabs(cookie):
+        cookie = os.path.join(datadir, subdir, cookie)
+    return {"host": host, "port": port, "user": user, "password": password, "cookie": cookie}
 
 _cfg = _load_config()
-_BASE_ARGS = _build_base_args(_cfg)
-
-def cli(*args, wallet=None):
-    """Call bitcoin-cli [network] [wallet] <args> and return parsed JSON or string."""
-    cmd = list(_BASE_ARGS)
-    if wallet:
-        cmd.append(f"-rpcwallet={wallet}")
-    cmd.extend(str(a) for a in args)
-
-    result = subprocess.run(cmd, capture_output=True, text=True, timeout=60)
-    if result.returncode != 0:
-        raise RuntimeError(f"bitcoin-cli error: {result.stderr.strip()}\n  cmd: {' '.join(cmd)}")
-
-    output = result.stdout.strip()
-    if not output:
-        return None
+_RPC = _build_rpc_endpoint(_cfg)
+
+# ── Transport ────────────────────────────────────────────────────────────────
+
+# One kept-alive connection per thread (http.client connections are not thread-safe)
+_local = threading.local()
+
+def _rpc_auth_header():
+    # The cookie is rewritten on every bitcoind restart, so read it per connection
+    if _RPC["user"]:
+        creds = f"{_RPC['user']}:{_RPC['password']}"
+    else:
+        try:
+            with open(_RPC["cookie"]) as f:
+                creds = f.read().strip()
+        except OSError as e:
+            raise RuntimeError(
+                f"bitcoin RPC error: no auth cookie at {_RPC['cookie']} ({e.strerror}) and no rpcuser "
+                f"in config.ini or bitcoin.conf — is bitcoind running with this datadir?"
+            ) from e
+    return "Basic " + base64.b64encode(creds.encode()).decode()
+
+
+def _rpc_post(payload, wallet=None):
+    """POST a JSON-RPC payload on this thread's persistent connection; return the decoded reply."""
+    conn = getattr(_local, "conn", None)
+    reused = conn is not None
+    if conn is None:
+        # Auth problems surface here as their own error, before any network I/O
+        _local.auth = _rpc_auth_header()
+        conn = _local.conn = http.client.HTTPConnection(_RPC["host"], _RPC["port"], timeout=60)
+    path = f"/wallet/{urllib.parse.quote(wallet)}" if wallet else "/"
+    body = json.dumps(payload)
     try:
-        return json.loads(output)
+        headers = {
+            "Authorization": _local.auth,
+            "Content-Type": "application/json",
+            "Connection": "keep-alive",
+        }
+        try:
+            conn.request("POST", path, body, headers)
+            resp = conn.getresponse()
+        except (http.client.RemoteDisconnected, BrokenPipeError, ConnectionResetError):
+            # bitcoind dropped the idle keep-alive socket; reconnect once
+            if not reused:
+                raise
+            conn.close()
+            try:
+                headers["Authorization"] = _local.auth = _rpc_auth_header()
+            except RuntimeError:
+                _local.conn = None
+                raise
+            conn.request("POST", path, body, headers)
+            resp = conn.getresponse()
+        raw = resp.read()
+    except (OSError, http.client.HTTPException) as e:
+        conn.close()
+        _local.conn = None
+        raise RuntimeError(f"bitcoin RPC error: cannot reach {_RPC['host']}:{_RPC['port']} ({e})") from e
+
+    if resp.status == 401:
+        # Drop the connection so the next call re-reads the (possibly rotated) cookie
+        conn.close()
+        _local.conn = None
+        raise RuntimeError(f"bitcoin RPC error: authentication failed for {_RPC['host']}:{_RPC['port']}")
+    try:
+        return json.loads(raw)
     except json.JSONDecodeError:
-        return output
+        raise RuntimeError(f"bitcoin RPC error: HTTP {resp.status} {raw[:200]!r}")
+
+
+def cli(*args, wallet=None):
+    """Call <method> [params...] on bitcoind (optionally on a wallet) and return the result.
+
+    Params are native Python values, sent verbatim (a str is always a JSON string).
+    """
+    method, params = args[0], list(args[1:])
+    reply = _rpc_post({"jsonrpc": "1.0", "id": 0, "method": method, "params": params}, wallet)
+    if reply.get("error"):
+        raise RuntimeError(
+            f"bitcoin RPC error: {reply['error'].get('message')}\n"
+            f"  call: {method} {' '.join(map(str, args[1:]))}"
+        )
+    return reply["result"]
+
+
+def batch_cli(calls, wallet=None, errors_as_none=False):
+    """Send [(method, params), ...] as one JSON-RPC batch and return results in order.
+
+    Params are native Python values, as for cli().
+    With errors_as_none, a failed entry comes back as None instead of raising,
+    so the other results in the batch are kept.
+    """
+    if not calls:
+        return []
+    replies = _rpc_post([
+        {"jsonrpc": "1.0", "id": i, "method": method, "params": list(params)}
+        for i, (method, params) in enumerate(calls)
+    ], wallet)
+    if isinstance(replies, dict):  # whole batch rejected
+        raise RuntimeError(f"bitcoin RPC error: {(replies.get('error') or {}).get('message')}")
+
+    results = [None] * len(calls)
+    for reply in replies:
+        i = reply["id"]
+        if reply.get("error"):
+            if errors_as_none:
+                continue
+            raise RuntimeError(f"bitcoin RPC error in {calls[i][0]}: {reply['error'].get('message')}")
+        results[i] = reply["result"]
+    return results
 
 
 def mine_blocks(n=1):
     """Mine n blocks on regtest using generatetoaddress."""
     miner_addr = cli("getnewaddress", "", "bech32", wallet="miner")
-    cli("generatetoaddress", n, miner_addr)
-    return int(cli("getblockcount"))
+    # bitcoind runs batch entries in order, so the new tip comes back in the same round trip
+    _, height = batch_cli([("generatetoaddress", [n, miner_addr]), ("getblockcount", [])])
+    return height
 
 
 def get_tx(txid):
     """Get decoded transaction."""
-    return cli("getrawtransaction", txid, "true")
+    return cli("getrawtransaction", txid, True)
+
 
+def _with_sats(utxos):
+    # Integer satoshis alongside the RPC's float BTC, so callers never do float fee math
+    for u in utxos:
+        u["sats"] = round(u["amount"] * 1e8)
+    return utxos
 
-def get_utxos(wallet_name, min_conf=0):
-    """List unspent outputs for a wallet."""
-    return cli("listunspent", min_conf, wallet=wallet_name)
+
+def get_txs(txids, missing_ok=False):
+    """Decoded transactions for many txids in one batched round-trip (order preserved).
+
+    With missing_ok, an unfetchable txid yields None in its slot instead of failing the batch.
+    """
+    return batch_cli([("getrawtransaction", [txid, True]) for txid in txids], errors_as_none=missing_ok)
+
+
+def find_vout_for_addr(txid, address):
+    """Locate `address`'s output in `txid` (listunspent-shaped dict), or None — no wallet scan."""
+    for out in get_tx(txid)["vout"]:
+        if out["scriptPubKey"].get("address") == address:
+            return _with_sats([{"txid": txid, "vout": out["n"], "amount": out["value"], "address": address}])[0]
+    return None
+
+
+def get_utxos(wallet_name, min_conf=0, min_amount=None, max_count=None, max_amount=None):
+    """List unspent outputs (each with integer "sats"), optionally filtered by bitcoind (min_amount ≤ amount ≤ max_amount BTC)."""
+    query = {}
+    if min_amount is not None:
+        query["minimumAmount"] = min_amount
+    if max_amount is not None:
+        query["maximumAmount"] = max_amount
+    if max_count is not None:
+        query["maximumCount"] = max_count
+    if not query:
+        return _with_sats(cli("listunspent", min_conf, wallet=wallet_name))
+    return _with_sats(cli("listunspent", min_conf, 9999999, [], True, query, wallet=wallet_name))
 
 
 def get_balance(wallet_name):
@@ -90,6 +242,11 @@ def get_balance(wallet_name):
     return float(cli("getbalance", wallet=wallet_name))
 
 
+def has_balance(wallet_name, min_btc):
+    """Whether the wallet holds ≥ min_btc (always a live getbalance)."""
+    return get_balance(wallet_name) >= min_btc
+
+
 def send_raw(hex_tx):
     """Broadcast a raw transaction."""
     return cli("sendrawtransaction", hex_tx)
@@ -97,9 +254,9 @@ def send_raw(hex_tx):
 
 def create_funded_psbt(wallet_name, inputs, outputs, options=None):
     """Create a funded PSBT."""
-    args = ["walletcreatefundedpsbt", json.dumps(inputs), json.dumps(outputs), 0]
+    args = ["walletcreatefundedpsbt", inputs, outputs, 0]
     if options:
-        args.append(json.dumps(options))
+        args.append(options)
     return cli(*args, wallet=wallet_name)
 
 
@@ -115,7 +272,7 @@ def finalize_psbt(psbt):
 
 def create_raw_tx(inputs, outputs):
     """Create a raw transaction."""
-    return cli("createrawtransaction", json.dumps(inputs), json.dumps(outputs))
+    return cli("createrawtransaction", inputs, outputs)
 
 
 def sign_raw_tx(wallet_name, hex_tx):
@@ -123,6 +280,17 @@ def sign_raw_tx(wallet_name, hex_tx):
     return cli("signrawtransactionwithwallet", hex_tx, wallet=wallet_name)
 
 
+def sign_and_send(wallet_name, hex_tx):
+    """Sign a raw transaction with the wallet and broadcast it; return the txid.
+
+    The broadcast needs the signed hex, so this stays two dependent calls.
+    """
+    signed = sign_raw_tx(wallet_name, hex_tx)
+    if not signed.get("complete"):
+        raise RuntimeError(f"bitcoin RPC error: {wallet_name} could not fully sign the transaction")
+    return send_raw(signed["hex"])
+
+
 def get_block_count():
     """Get current block height."""
     return int(cli("getblockcount"))
@@ -133,8 +301,13 @@ def get_new_address(wallet_name, addr_type="bech32"):
     return cli("getnewaddress", "", addr_type, wallet=wallet_name)
 
 
+def get_new_addresses(wallet_name, n, addr_type="bech32"):
+    """Get n new addresses in a single batched round-trip."""
+    return batch_cli([("getnewaddress", ["", addr_type])] * n, wallet=wallet_name)
+
+
 def send_to_address(wallet_name, address, amount):
     """Send BTC to an address."""
-    return cli("sendtoaddress", address, f"{amount:.8f}", wallet=wallet_name)
+    return cli("sendtoaddress", address, round(amount, 8), wallet=wallet_name)
 
 
@@ -20,15 +20,24 @@ Usage:
 import sys
 import os
 import json
+import re
 import argparse
-from collections import defaultdict
+import functools
+import statistics
+from array import array
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
-from bitcoin_rpc import cli, get_tx
+from bitcoin_rpc import cli, get_tx, get_txs
 
 FINDINGS = []
 WARNINGS = []
 
+# Batched tx fetches run side by side; each worker thread keeps its own RPC connection
+_RPC_WORKERS = 4
+_RPC_POOL = ThreadPoolExecutor(max_workers=_RPC_WORKERS)
+
 def section(title):
     print(f"[{title}]", file=sys.stderr)
 
@@ -44,6 +53,14 @@ def ok(msg):
 def info(msg):
     print(f"  {msg}", file=sys.stderr)
 
+def to_sats(btc):
+    """Quantize a BTC float from RPC to integer satoshis."""
+    return int(round(btc * 1e8))
+
+def sats_to_btc(sats):
+    """Present integer satoshis as BTC in report output."""
+    return sats / 1e8
+
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 1. WALLET + ADDRESS RESOLUTION
@@ -84,21 +101,40 @@ def resolve_descriptors(args):
     return descs
 
 
+@functools.cache
+def parse_descriptor(desc):
+    """Return (script type, top-level function) for a descriptor string."""
+    body = desc.partition("#")[0]
+    func = body.split("(", 1)[0]
+    dtype = "unknown"
+    if body.startswith("wpkh("): dtype = "p2wpkh"
+    elif body.startswith("tr("): dtype = "p2tr"
+    elif body.startswith("sh(wpkh("): dtype = "p2sh-p2wpkh"
+    elif body.startswith("pkh("): dtype = "p2pkh"
+    return dtype, func
+
+
+# One anchored match classifies every prefix: segwit v0/v1 HRPs, then P2SH
+_ADDR_PREFIX = re.compile(r"(?:tb|bc|bcrt)1(q|p)|[23]")
+_PREFIX_TYPES = {"q": "p2wpkh", "p": "p2tr", None: "p2sh-p2wpkh"}
+
+@functools.lru_cache(maxsize=4096)
+def script_type_from_prefix(address):
+    """Heuristic script type from an address prefix (mainnet, testnet/signet, regtest)."""
+    m = _ADDR_PREFIX.match(address)
+    return _PREFIX_TYPES[m.group(1)] if m else "unknown"
+
+
 def derive_all_addresses(descriptors):
     """Derive addresses from all descriptors, return {address -> (desc_type, internal, index)}."""
     addr_map = {}  # address -> metadata
     for dinfo in descriptors:
         desc = dinfo["desc"]
         rng = min(dinfo["range_end"], 999)
-        # Detect descriptor type
-        dtype = "unknown"
-        if desc.startswith("wpkh("): dtype = "p2wpkh"
-        elif desc.startswith("tr("): dtype = "p2tr"
-        elif desc.startswith("sh(wpkh("): dtype = "p2sh-p2wpkh"
-        elif desc.startswith("pkh("): dtype = "p2pkh"
+        dtype = parse_descriptor(desc)[0]
 
         try:
-            addrs = cli("deriveaddresses", desc, f"[0,{rng}]")
+            addrs = cli("deriveaddresses", desc, [0, rng])
             if addrs:
                 for i, a in enumerate(addrs):
                     addr_map[a] = {
@@ -120,7 +156,7 @@ def build_scan_wallet(descriptors, wallet_name="_detect_scan"):
         pass
 
     try:
-        cli("createwallet", wallet_name, "true", "true", "", "false", "true")
+        cli("createwallet", wallet_name, True, True, "", False, True)
     except Exception:
         try:
             cli("loadwallet", wallet_name)
@@ -137,7 +173,7 @@ def build_scan_wallet(descriptors, wallet_name="_detect_scan"):
             "range": [0, d["range_end"]],
         })
 
-    result = cli("importdescriptors", json.dumps(import_batch), wallet=wallet_name)
+    result = cli("importdescriptors", import_batch, wallet=wallet_name)
     # Check results
     for r in (result or []):
         if not r.get("success"):
@@ -148,7 +184,7 @@ def build_scan_wallet(descriptors, wallet_name="_detect_scan"):
 
 def get_all_transactions(wallet_name, count=10000):
     """Get full transaction history for the wallet."""
-    txs = cli("listtransactions", "*", count, 0, "true", wallet=wallet_name)
+    txs = cli("listtransactions", "*", count, 0, True, wallet=wallet_name)
     return txs or []
 
 
@@ -161,16 +197,41 @@ def get_all_utxos(wallet_name):
 # 2. TRANSACTION GRAPH BUILDER
 # ═══════════════════════════════════════════════════════════════════════════════
 
+@functools.cache
+def wallet_txids(wallet):
+    """Frozen set of every txid in a wallet's history (one listtransactions per wallet per run)."""
+    txs = cli("listtransactions", "*", 10000, 0, True, wallet=wallet)
+    return frozenset(tx["txid"] for tx in (txs or []) if tx.get("txid"))
+
+
+def spent_vins(tx):
+    """The vins of a decoded tx that spend an earlier output (a coinbase input spends none)."""
+    return [vin for vin in tx.get("vin", []) if not vin.get("coinbase")]
+
+
+def _get_txs_or_none(txids):
+    # Unfetchable txids come back as None entries; only a failed round-trip loses the chunk
+    try:
+        return get_txs(txids, missing_ok=True)
+    except Exception:
+        return None
+
+
 class TxGraph:
     """Indexed view of all transactions touching our address set."""
 
     def __init__(self, addr_map, wallet_txs, utxos):
         self.addr_map = addr_map          # {address -> metadata}
-        self.our_addrs = set(addr_map.keys())
+        self.our_addrs = frozenset(addr_map)
+        # Bound C-level membership test; detectors call this in tight loops
+        self.is_ours = self.our_addrs.__contains__
         self.utxos = utxos                # current UTXOs
+        for u in utxos:
+            u["sats"] = to_sats(u["amount"])
         self.tx_cache = {}                # txid -> decoded tx
         self._input_cache = {}            # txid -> parsed input addresses
         self._output_cache = {}           # txid -> parsed output addresses
+        self._fee_cache = {}              # txid -> fee in sats
         self.our_txids = set()            # txids we participate in
 
         # Index: address -> list of (txid, direction, value)
@@ -200,9 +261,38 @@ class TxGraph:
             try:
                 self.tx_cache[txid] = get_tx(txid)
             except Exception:
-                return None
+                # Negative entry: an unfetchable txid is never requested again
+                self.tx_cache[txid] = None
         return self.tx_cache[txid]
 
+    def prefetch(self, txids, min_chunk=25, max_chunk=500):
+        """Batch-fetch every uncached txid, chunks in parallel; unfetchable txids are cached as None."""
+        missing = [t for t in dict.fromkeys(txids) if t not in self.tx_cache]
+        if not missing:
+            return
+        # One chunk per worker so the pool actually overlaps round trips; tiny
+        # fetches stay a single batch, and huge ones are capped per request
+        chunk = max(min_chunk, min(max_chunk, -(-len(missing) // _RPC_WORKERS)))
+        parts = [missing[i:i + chunk] for i in range(0, len(missing), chunk)]
+        for part, txs in zip(parts, _RPC_POOL.map(_get_txs_or_none, parts)):
+            if txs is not None:
+                self.tx_cache.update(zip(part, txs))
+
+    def prefetch_ancestry(self, txids, depth=1):
+        """Warm the cache for txids and `depth` generations of ancestors, one batched wave per generation."""
+        frontier = list(dict.fromkeys(txids))
+        for level in range(depth + 1):
+            self.prefetch(frontier)
+            if level == depth:
+                break
+            frontier = list(dict.fromkeys(
+                vin["txid"]
+                for txid in frontier if self.tx_cache.get(txid)
+                for vin in spent_vins(self.tx_cache[txid])
+            ))
+            if not frontier:
+                break
+
     def get_input_addresses(self, txid):
         """Get all input addresses for a transaction (cached)."""
         if txid in self._input_cache:
@@ -212,15 +302,15 @@ class TxGraph:
             self._input_cache[txid] = []
             return []
         addrs = []
-        for vin in tx.get("vin", []):
-            if vin.get("coinbase"):
-                continue
-            parent = self.fetch_tx(vin["txid"])
-            if parent:
-                vout_data = parent["vout"][vin["vout"]]
-                addr = vout_data.get("scriptPubKey", {}).get("address", "")
-                value = vout_data.get("value", 0)
-                addrs.append({"address": addr, "value": value, "txid": vin["txid"], "vout": vin["vout"]})
+        vins = spent_vins(tx)
+        self.prefetch(vin["txid"] for vin in vins)
+        for vin in vins:
+            parent_txid, n = vin["txid"], vin["vout"]
+            # Reuse the parent's parsed outputs: each vout is converted to sats once
+            parent_outs = self.get_output_addresses(parent_txid)
+            if parent_outs:
+                spent = parent_outs[n]
+                addrs.append({"address": spent["address"], "sats": spent["sats"], "txid": parent_txid, "vout": n})
         self._input_cache[txid] = addrs
         return addrs
 
@@ -234,32 +324,39 @@ class TxGraph:
             return []
         addrs = []
         for vout in tx.get("vout", []):
-            addr = vout.get("scriptPubKey", {}).get("address", "")
+            spk = vout.get("scriptPubKey", {})
             addrs.append({
-                "address": addr,
-                "value": vout["value"],
+                "address": spk.get("address", ""),
+                "sats": to_sats(vout["value"]),
                 "n": vout["n"],
-                "type": vout.get("scriptPubKey", {}).get("type", "unknown"),
+                "type": spk.get("type", "unknown"),
             })
         self._output_cache[txid] = addrs
         return addrs
 
-    def is_ours(self, address):
-        return address in self.our_addrs
+    @functools.cached_property
+    def send_txids(self):
+        """Txids where at least one input spends one of our addresses (computed once)."""
+        return frozenset(
+            txid for txid in self.our_txids
+            if any(self.is_ours(ia["address"]) for ia in self.get_input_addresses(txid))
+        )
+
+    def get_fee_sats(self, txid):
+        """Get the fee (input sats − output sats) for a transaction (cached)."""
+        if txid in self._fee_cache:
+            return self._fee_cache[txid]
+        in_total = sum(ia["sats"] for ia in self.get_input_addresses(txid))
+        out_total = sum(o["sats"] for o in self.get_output_addresses(txid))
+        self._fee_cache[txid] = in_total - out_total
+        return self._fee_cache[txid]
 
     def get_script_type(self, address):
         """Return the script type metadata for one of our addresses."""
         meta = self.addr_map.get(address)
         if meta:
             return meta["type"]
-        # Heuristic from prefix (supports mainnet, testnet/signet, regtest)
-        if address.startswith(("tb1q", "bc1q", "bcrt1q")):
-            return "p2wpkh"
-        if address.startswith(("tb1p", "bc1p", "bcrt1p")):
-            return "p2tr"
-        if address.startswith(("2", "3")):
-            return "p2sh-p2wpkh"
-        return "unknown"
+        return script_type_from_prefix(address)
 
 
 # ═══════════════════════════════════════════════════════════════════════════════
@@ -272,12 +369,13 @@ def detect_01_address_reuse(g: TxGraph):
     """Detect addresses that appear as recipients in multiple transactions."""
     section("1 · Address Reuse")
     reused = {}
-    for addr in g.our_addrs:
+    # Only addresses with wallet history can be reused, so walk that index rather
+    # than every derived address; fewer than two entries can't be two receives
+    for addr, entries in g.addr_txs.items():
+        if len(entries) < 2 or not g.is_ours(addr):
+            continue
         # Count distinct TXIDs where this address received funds
-        receive_txids = set()
-        for entry in g.addr_txs.get(addr, []):
-            if entry["category"] == "receive":
-                receive_txids.add(entry["txid"])
+        receive_txids = {e["txid"] for e in entries if e["category"] == "receive"}
         if len(receive_txids) >= 2:
             reused[addr] = receive_txids
 
@@ -354,7 +452,7 @@ def detect_02_cioh(g: TxGraph):
                     {
                         "address": ia["address"],
                         "role": "change" if g.addr_map.get(ia["address"], {}).get("internal") else "receive",
-                        "amount_btc": round(ia["value"], 8),
+                        "amount_btc": sats_to_btc(ia["sats"]),
                     }
                     for ia in our_inputs
                 ],
@@ -379,18 +477,17 @@ def detect_03_dust(g: TxGraph):
 
     found = []
     for utxo in g.utxos:
-        sats = int(round(utxo["amount"] * 1e8))
-        if sats <= DUST_SATS and g.is_ours(utxo.get("address", "")):
+        if utxo["sats"] <= DUST_SATS and g.is_ours(utxo.get("address", "")):
             found.append(utxo)
 
-    # Also check historical: any tx that sent dust to our addresses
-    hist_dust = []
+    # Also check historical: any tx that sent dust to our addresses,
+    # deduplicated by (txid, address) as it is collected (first one wins)
+    hist_dust = {}
     for txid in g.our_txids:
-        outputs = g.get_output_addresses(txid)
-        for out in outputs:
-            sats = int(round(out["value"] * 1e8))
-            if sats <= DUST_SATS and g.is_ours(out["address"]):
-                hist_dust.append({"txid": txid, "address": out["address"], "sats": sats})
+        for out in g.get_output_addresses(txid):
+            # Cheap integer test first; the address lookup only runs for dust
+            if out["sats"] <= DUST_SATS and g.is_ours(out["address"]):
+                hist_dust.setdefault((txid, out["address"]), {"txid": txid, "address": out["address"], "sats": out["sats"]})
 
     if not found and not hist_dust:
         ok("No dust UTXOs detected.")
@@ -398,7 +495,7 @@ def detect_03_dust(g: TxGraph):
 
     if found:
         for u in found:
-            sats = int(round(u["amount"] * 1e8))
+            sats = u["sats"]
             label = "STRICT_DUST" if sats <= STRICT_DUST else "dust-class"
             finding({
                 "type": "DUST",
@@ -420,19 +517,10 @@ def detect_03_dust(g: TxGraph):
                 ),
             })
 
-    # Deduplicate historical
-    seen = set()
-    unique_hist = []
-    for h in hist_dust:
-        key = (h["txid"], h["address"])
-        if key not in seen:
-            seen.add(key)
-            unique_hist.append(h)
-
-    if unique_hist:
+    if hist_dust:
         current_keys = {(u["txid"], u.get("address", "")) for u in found}
-        for h in unique_hist:
-            if (h["txid"], h["address"]) not in current_keys:
+        for key, h in hist_dust.items():
+            if key not in current_keys:
                 finding({
                     "type": "DUST",
                     "severity": "LOW",
@@ -467,10 +555,9 @@ def detect_04_dust_spending(g: TxGraph):
         for ia in input_addrs:
             if not g.is_ours(ia["address"]):
                 continue
-            sats = int(round(ia["value"] * 1e8))
-            if sats <= DUST_SATS:
+            if ia["sats"] <= DUST_SATS:
                 dust_inputs.append(ia)
-            elif sats > 10000:  # > 10k sats = clearly normal
+            elif ia["sats"] > 10000:  # > 10k sats = clearly normal
                 normal_inputs.append(ia)
 
         if dust_inputs and normal_inputs:
@@ -481,8 +568,8 @@ def detect_04_dust_spending(g: TxGraph):
                 "description": f"TX {txid} spends {len(dust_inputs)} dust input(s) alongside {len(normal_inputs)} normal input(s)",
                 "details": {
                     "txid": txid,
-                    "dust_inputs": [{"address": d["address"], "sats": int(round(d["value"] * 1e8))} for d in dust_inputs],
-                    "normal_inputs": [{"address": n["address"], "amount_btc": round(n["value"], 8)} for n in normal_inputs],
+                    "dust_inputs": [{"address": d["address"], "sats": d["sats"]} for d in dust_inputs],
+                    "normal_inputs": [{"address": n["address"], "amount_btc": sats_to_btc(n["sats"])} for n in normal_inputs],
                 },
                 "correction": (
                     "Freeze dust UTXOs in your wallet to prevent them from being automatically selected as inputs. "
@@ -516,22 +603,26 @@ def detect_05_change_detection(g: TxGraph):
         if not our_in:
             continue
 
-        # Identify which outputs are ours (change) vs external (payment)
-        our_outs = [o for o in outputs if g.is_ours(o["address"])]
-        ext_outs = [o for o in outputs if not g.is_ours(o["address"])]
+        # Identify which outputs are ours (change) vs external (payment), in one pass
+        our_outs, ext_outs = [], []
+        for o in outputs:
+            (our_outs if g.is_ours(o["address"]) else ext_outs).append(o)
 
         if not our_outs or not ext_outs:
             continue  # can't distinguish change if all outputs are ours or all external
 
         # Check change-detection heuristics
         problems = []
+        in_types = frozenset(g.get_script_type(ia["address"]) for ia in our_in)
 
         for change in our_outs:
-            ch_sats = int(round(change["value"] * 1e8))
+            ch_sats = change["sats"]
             ch_round = ch_sats % 100000 == 0 or ch_sats % 1000000 == 0
+            ch_type_matches = g.get_script_type(change["address"]) in in_types
+            ch_internal = g.addr_map.get(change["address"], {}).get("internal")
 
             for payment in ext_outs:
-                pay_sats = int(round(payment["value"] * 1e8))
+                pay_sats = payment["sats"]
                 pay_round = pay_sats % 100000 == 0 or pay_sats % 1000000 == 0
 
                 # Heuristic 1: payment is round, change is not
@@ -539,16 +630,13 @@ def detect_05_change_detection(g: TxGraph):
                     problems.append(f"Round payment ({pay_sats} sats) vs non-round change ({ch_sats} sats)")
 
                 # Heuristic 2: change has same script type as input
-                in_types = set(g.get_script_type(ia["address"]) for ia in our_in)
-                ch_type = g.get_script_type(change["address"])
-                if ch_type in in_types and change["type"] != payment["type"]:
+                if ch_type_matches and change["type"] != payment["type"]:
                     problems.append(
                         f"Change script type ({change['type']}) matches input type — different from payment ({payment['type']})"
                     )
 
                 # Heuristic 3: change address is internal (derivation /1/*)
-                ch_meta = g.addr_map.get(change["address"], {})
-                if ch_meta.get("internal"):
+                if ch_internal:
                     problems.append("Change uses an internal (BIP-44 /1/*) derivation path — standard wallet change pattern")
 
         if problems:
@@ -560,7 +648,7 @@ def detect_05_change_detection(g: TxGraph):
                 "details": {
                     "txid": txid,
                     "reasons": problems[:6],
-                    "change_outputs": [{"address": co["address"], "amount_btc": round(co["value"], 8)} for co in our_outs],
+                    "change_outputs": [{"address": co["address"], "amount_btc": sats_to_btc(co["sats"])} for co in our_outs],
                 },
                 "correction": (
                     "Use PayJoin (BIP-78) so the receiver also contributes an input, breaking the payment/change heuristic. "
@@ -596,11 +684,11 @@ def detect_06_consolidation_origin(g: TxGraph):
             finding({
                 "type": "CONSOLIDATION",
                 "severity": "MEDIUM",
-                "description": f"UTXO {utxo['txid']}:{utxo['vout']} ({utxo['amount']:.8f} BTC) born from a {n_in}-input consolidation",
+                "description": f"UTXO {utxo['txid']}:{utxo['vout']} ({sats_to_btc(utxo['sats']):.8f} BTC) born from a {n_in}-input consolidation",
                 "details": {
                     "txid": utxo["txid"],
                     "vout": utxo["vout"],
-                    "amount_btc": round(utxo["amount"], 8),
+                    "amount_btc": sats_to_btc(utxo["sats"]),
                     "consolidation_inputs": n_in,
                     "consolidation_outputs": n_out,
                     "our_inputs_in_consolidation": len(our_parent_in),
@@ -632,10 +720,9 @@ def detect_07_script_type_mixing(g: TxGraph):
         if len(our_in) < 2:
             continue
 
-        types = set()
-        for ia in input_addrs:
-            types.add(g.get_script_type(ia["address"]))
-
+        # Classify each input once; the set and the report both reuse it
+        in_types = [g.get_script_type(ia["address"]) for ia in input_addrs]
+        types = set(in_types)
         types.discard("unknown")
         if len(types) >= 2:
             found_any = True
@@ -647,8 +734,8 @@ def detect_07_script_type_mixing(g: TxGraph):
                     "txid": txid,
                     "script_types": sorted(types),
                     "inputs": [
-                        {"address": ia["address"], "script_type": g.get_script_type(ia["address"]), "ours": g.is_ours(ia["address"])}
-                        for ia in input_addrs
+                        {"address": ia["address"], "script_type": st, "ours": g.is_ours(ia["address"])}
+                        for ia, st in zip(input_addrs, in_types)
                     ],
                 },
                 "correction": (
@@ -684,12 +771,8 @@ def detect_08_cluster_merge(g: TxGraph):
             parent_tx = g.fetch_tx(ia["txid"])
             if not parent_tx:
                 continue
-            gp_sources = set()
-            for p_vin in parent_tx.get("vin", []):
-                if p_vin.get("coinbase"):
-                    gp_sources.add("coinbase")
-                else:
-                    gp_sources.add(p_vin["txid"][:16])
+            # A coinbase's only vin is the coinbase input, so no spent vins means newly mined coins
+            gp_sources = {p_vin["txid"][:16] for p_vin in spent_vins(parent_tx)} or {"coinbase"}
             funding_sources[f"{ia['txid'][:16]}:{ia['vout']}"] = gp_sources
 
         # Check if funding sources differ
@@ -738,19 +821,17 @@ def detect_09_lookback_depth(g: TxGraph):
         ok("No UTXOs belonging to the descriptor.")
         return
 
-    # Get confirmation counts
-    aged = []
-    for u in our_utxos:
-        confs = u.get("confirmations", 0)
-        aged.append({"utxo": u, "confirmations": confs})
-
-    if len(aged) < 2:
+    if len(our_utxos) < 2:
         ok("Only one UTXO, no age comparison possible.")
         return
 
-    aged.sort(key=lambda x: x["confirmations"], reverse=True)
-    oldest = aged[0]
-    newest = aged[-1]
+    # Confirmation counts all come from the one listunspent snapshot (same tip),
+    # and only the extremes matter, so no per-tx lookups and no full sort
+    confs = [u.get("confirmations", 0) for u in our_utxos]
+    oldest_i = max(range(len(confs)), key=confs.__getitem__)
+    newest_i = min(reversed(range(len(confs))), key=confs.__getitem__)
+    oldest = {"utxo": our_utxos[oldest_i], "confirmations": confs[oldest_i]}
+    newest = {"utxo": our_utxos[newest_i], "confirmations": confs[newest_i]}
     spread = oldest["confirmations"] - newest["confirmations"]
 
     if spread < 10:
@@ -763,8 +844,8 @@ def detect_09_lookback_depth(g: TxGraph):
         "description": f"UTXO age spread of {spread} blocks between oldest and newest",
         "details": {
             "spread_blocks": spread,
-            "oldest": {"txid": oldest["utxo"]["txid"], "confirmations": oldest["confirmations"], "amount_btc": round(oldest["utxo"]["amount"], 8)},
-            "newest": {"txid": newest["utxo"]["txid"], "confirmations": newest["confirmations"], "amount_btc": round(newest["utxo"]["amount"], 8)},
+            "oldest": {"txid": oldest["utxo"]["txid"], "confirmations": oldest["confirmations"], "amount_btc": sats_to_btc(oldest["utxo"]["sats"])},
+            "newest": {"txid": newest["utxo"]["txid"], "confirmations": newest["confirmations"], "amount_btc": sats_to_btc(newest["utxo"]["sats"])},
         },
         "correction": (
             "Prefer spending older UTXOs first (FIFO coin selection) to normalize the age distribution of your "
@@ -775,14 +856,14 @@ def detect_09_lookback_depth(g: TxGraph):
     })
 
     OLD_THRESHOLD = 100  # blocks
-    old_utxos = [a for a in aged if a["confirmations"] >= OLD_THRESHOLD]
-    if old_utxos:
+    old_count = sum(c >= OLD_THRESHOLD for c in confs)
+    if old_count:
         warn({
             "type": "DORMANT_UTXOS",
             "severity": "LOW",
-            "description": f"{len(old_utxos)} UTXO(s) have ≥{OLD_THRESHOLD} confirmations (dormant/hoarded coins pattern)",
+            "description": f"{old_count} UTXO(s) have ≥{OLD_THRESHOLD} confirmations (dormant/hoarded coins pattern)",
             "details": {
-                "count": len(old_utxos),
+                "count": old_count,
                 "threshold_blocks": OLD_THRESHOLD,
             },
         })
@@ -797,12 +878,10 @@ def detect_10_exchange_origin(g: TxGraph, known_exchange_wallets=None):
     if known_exchange_wallets:
         for ew in known_exchange_wallets:
             try:
-                etxs = cli("listtransactions", "*", 10000, 0, "true", wallet=ew)
-                for etx in (etxs or []):
-                    if etx.get("txid"):
-                        exchange_txids.add(etx["txid"])
+                exchange_txids |= wallet_txids(ew)
             except Exception:
                 pass
+    exchange_txids = frozenset(exchange_txids)
 
     BATCH_THRESHOLD = 5  # ≥5 outputs = likely batch withdrawal
     found_any = False
@@ -817,13 +896,13 @@ def detect_10_exchange_origin(g: TxGraph, known_exchange_wallets=None):
             continue
 
         # Check: do we RECEIVE in this tx? (we're a recipient, not sender)
-        our_inputs = [ia for ia in g.get_input_addresses(txid) if g.is_ours(ia["address"])]
-        our_outputs = [o for o in g.get_output_addresses(txid) if g.is_ours(o["address"])]
-
-        if our_inputs:
+        if txid in g.send_txids:
             # We're a sender in a many-output TX — that's OUR batch, not exchange
             continue
 
+        outputs = g.get_output_addresses(txid)
+        our_outputs = [o for o in outputs if g.is_ours(o["address"])]
+
         if not our_outputs:
             continue
 
@@ -833,12 +912,8 @@ def detect_10_exchange_origin(g: TxGraph, known_exchange_wallets=None):
         # 1. High output count
         signals.append(f"High output count: {n_out}")
 
-        # 2. Many unique addresses
-        unique_addrs = set()
-        for vout in tx["vout"]:
-            a = vout.get("scriptPubKey", {}).get("address", "")
-            if a:
-                unique_addrs.add(a)
+        # 2. Many unique addresses (from the already-parsed outputs)
+        unique_addrs = {o["address"] for o in outputs if o["address"]}
         if len(unique_addrs) >= BATCH_THRESHOLD:
             signals.append(f"{len(unique_addrs)} unique recipient addresses")
 
@@ -848,10 +923,9 @@ def detect_10_exchange_origin(g: TxGraph, known_exchange_wallets=None):
 
         # 4. Large input relative to individual outputs
         input_addrs = g.get_input_addresses(txid)
-        input_total = sum(ia["value"] for ia in input_addrs)
-        output_vals = sorted(v.get("value", 0) for v in tx["vout"])
-        if output_vals:
-            median_out = output_vals[len(output_vals) // 2]
+        input_total = sum(ia["sats"] for ia in input_addrs)
+        if outputs:
+            median_out = statistics.median_high(o["sats"] for o in outputs)
             if median_out > 0:
                 ratio = input_total / median_out
                 if ratio > 10:
@@ -866,7 +940,7 @@ def detect_10_exchange_origin(g: TxGraph, known_exchange_wallets=None):
                 "details": {
                     "txid": txid,
                     "signals": signals,
-                    "received_outputs": [{"address": o["address"], "amount_btc": round(o["value"], 8)} for o in our_outputs],
+                    "received_outputs": [{"address": o["address"], "amount_btc": sats_to_btc(o["sats"])} for o in our_outputs],
                 },
                 "correction": (
                     "Withdraw via Lightning Network instead of on-chain to avoid the exchange-origin fingerprint entirely. "
@@ -895,10 +969,7 @@ def detect_11_tainted_utxos(g: TxGraph, known_risky_wallets=None):
     risky_txids = set()
     for rw in known_risky_wallets:
         try:
-            rtxs = cli("listtransactions", "*", 10000, 0, "true", wallet=rw)
-            for rtx in (rtxs or []):
-                if rtx.get("txid"):
-                    risky_txids.add(rtx["txid"])
+            risky_txids |= wallet_txids(rw)
         except Exception:
             info(f"Could not read wallet '{rw}'")
 
@@ -909,19 +980,24 @@ def detect_11_tainted_utxos(g: TxGraph, known_risky_wallets=None):
     found_any = False
 
     for txid in g.our_txids:
+        if txid not in g.send_txids:
+            continue
         input_addrs = g.get_input_addresses(txid)
-        our_in = [ia for ia in input_addrs if g.is_ours(ia["address"])]
-        if not our_in or len(input_addrs) < 2:
+        if len(input_addrs) < 2:
+            continue
+
+        # An input is tainted if its funding TX is in a risky wallet's history.
+        # Funding txids as a set op: a merge needs some, but not all, parents risky.
+        # That rejects the common all-clean (and all-tainted) cases in C.
+        parent_txids = {ia["txid"] for ia in input_addrs}
+        tainted_parents = parent_txids & risky_txids
+        if not tainted_parents or tainted_parents == parent_txids:
             continue
 
         tainted = []
         clean = []
         for ia in input_addrs:
-            # An input is tainted if its funding TX is in a risky wallet's history
-            if ia["txid"] in risky_txids:
-                tainted.append(ia)
-            else:
-                clean.append(ia)
+            (tainted if ia["txid"] in tainted_parents else clean).append(ia)
 
         if tainted and clean:
             found_any = True
@@ -932,8 +1008,8 @@ def detect_11_tainted_utxos(g: TxGraph, known_risky_wallets=None):
                 "description": f"TX {txid} merges {len(tainted)} tainted + {len(clean)} clean inputs ({round(taint_pct)}% taint)",
                 "details": {
                     "txid": txid,
-                    "tainted_inputs": [{"address": t["address"], "amount_btc": round(t["value"], 8), "source_txid": t["txid"]} for t in tainted],
-                    "clean_inputs": [{"address": c["address"], "amount_btc": round(c["value"], 8)} for c in clean],
+                    "tainted_inputs": [{"address": t["address"], "amount_btc": sats_to_btc(t["sats"]), "source_txid": t["txid"]} for t in tainted],
+                    "clean_inputs": [{"address": c["address"], "amount_btc": sats_to_btc(c["sats"])} for c in clean],
                     "taint_pct": round(taint_pct),
                 },
                 "correction": (
@@ -946,25 +1022,40 @@ def detect_11_tainted_utxos(g: TxGraph, known_risky_wallets=None):
             })
 
     # Also check: did we receive directly from a risky source?
-    for txid in g.our_txids:
-        if txid in risky_txids:
-            our_outs = [o for o in g.get_output_addresses(txid) if g.is_ours(o["address"])]
-            if our_outs:
-                found_any = True
-                warn({
-                    "type": "DIRECT_TAINT",
-                    "severity": "HIGH",
-                    "description": f"TX {txid} is directly from a known risky source",
-                    "details": {
-                        "txid": txid,
-                        "received_outputs": [{"address": o["address"], "amount_btc": round(o["value"], 8)} for o in our_outs],
-                    },
-                })
+    for txid in g.our_txids & risky_txids:
+        our_outs = [o for o in g.get_output_addresses(txid) if g.is_ours(o["address"])]
+        if our_outs:
+            found_any = True
+            warn({
+                "type": "DIRECT_TAINT",
+                "severity": "HIGH",
+                "description": f"TX {txid} is directly from a known risky source",
+                "details": {
+                    "txid": txid,
+                    "received_outputs": [{"address": o["address"], "amount_btc": sats_to_btc(o["sats"])} for o in our_outs],
+                },
+            })
 
     if not found_any:
         ok("No tainted UTXO merges detected.")
 
 
+# scriptPubKey type -> bit; types not listed here get the next free bit on first sight
+SCRIPT_TYPE_BITS = {
+    "pubkeyhash": 1 << 0,
+    "scripthash": 1 << 1,
+    "witness_v0_keyhash": 1 << 2,
+    "witness_v0_scripthash": 1 << 3,
+    "witness_v1_taproot": 1 << 4,
+}
+
+def script_type_bit(stype):
+    return SCRIPT_TYPE_BITS.setdefault(stype, 1 << len(SCRIPT_TYPE_BITS))
+
+def script_types_from_mask(mask):
+    return {t for t, bit in SCRIPT_TYPE_BITS.items() if mask & bit}
+
+
 def detect_12_behavioral_fingerprint(g: TxGraph):
     """
     Analyze the descriptor's transaction set for patterns that make the user
@@ -975,32 +1066,28 @@ def detect_12_behavioral_fingerprint(g: TxGraph):
     """
     section("12 · Behavioral Fingerprint Analysis")
 
-    # Collect send transactions (where we have inputs)
-    send_txids = []
-    for txid in g.our_txids:
-        input_addrs = g.get_input_addresses(txid)
-        our_in = [ia for ia in input_addrs if g.is_ours(ia["address"])]
-        if our_in:
-            send_txids.append(txid)
+    # Send transactions (where we have inputs)
+    send_txids = list(g.send_txids)
 
     if len(send_txids) < 3:
         ok(f"Only {len(send_txids)} send transactions — not enough data for fingerprinting.")
         return
 
     # ── Feature extraction ──
-    output_counts = []
-    payment_amounts_sats = []
-    change_amounts_sats = []
+    # Numeric features are kept as typed columns (one machine value per entry)
+    output_counts = array("l")
+    payment_amounts_sats = array("q")
+    change_amounts_sats = array("q")
     input_script_types = []
     output_script_types = []
-    rbf_signals = []
-    locktime_values = []
-    fee_rates = []     # sat/vB
-    n_inputs_list = []
+    rbf_signals = array("b")
+    locktime_values = array("q")
+    fee_rates = array("d")     # sat/vB
+    n_inputs_list = array("l")
     uses_round_amounts = 0
     total_payments = 0
-    change_address_types_used = set()
-    payment_address_types_used = set()
+    change_type_mask = 0
+    payment_type_mask = 0
     version_numbers = set()
 
     for txid in send_txids:
@@ -1008,10 +1095,8 @@ def detect_12_behavioral_fingerprint(g: TxGraph):
         if not tx:
             continue
 
-        n_in = len(tx.get("vin", []))
-        n_out = len(tx.get("vout", []))
-        n_inputs_list.append(n_in)
-        output_counts.append(n_out)
+        vins = tx.get("vin", [])
+        n_inputs_list.append(len(vins))
 
         # Version
         version_numbers.add(tx.get("version", 2))
@@ -1020,38 +1105,35 @@ def detect_12_behavioral_fingerprint(g: TxGraph):
         locktime_values.append(tx.get("locktime", 0))
 
         # RBF signalling
-        for vin in tx.get("vin", []):
-            seq = vin.get("sequence", 0xffffffff)
-            rbf_signals.append(seq < 0xfffffffe)
+        for vin in vins:
+            rbf_signals.append(vin.get("sequence", 0xffffffff) < 0xfffffffe)
 
         # Input script types
         for ia in g.get_input_addresses(txid):
             if g.is_ours(ia["address"]):
                 input_script_types.append(g.get_script_type(ia["address"]))
 
-        # Output analysis
+        # Output analysis: one pass over the parsed outputs feeds every output feature
         outputs = g.get_output_addresses(txid)
+        output_counts.append(len(outputs))
         for out in outputs:
-            sats = int(round(out["value"] * 1e8))
+            sats = out["sats"]
             if g.is_ours(out["address"]):
                 # Change output
                 change_amounts_sats.append(sats)
-                change_address_types_used.add(out["type"])
+                change_type_mask |= script_type_bit(out["type"])
             else:
                 # Payment output
                 payment_amounts_sats.append(sats)
                 output_script_types.append(out["type"])
-                payment_address_types_used.add(out["type"])
+                payment_type_mask |= script_type_bit(out["type"])
                 total_payments += 1
-                if sats > 0 and (sats % 100000 == 0 or sats % 1000000 == 0):
+                if sats > 0 and sats % 100_000 == 0:  # any 1M-sat multiple is a 100k-sat multiple too
                     uses_round_amounts += 1
 
         # Fee rate
         if "vsize" in tx and tx["vsize"] > 0:
-            # Compute fee from inputs - outputs
-            in_total = sum(ia["value"] for ia in g.get_input_addresses(txid))
-            out_total = sum(v.get("value", 0) for v in tx["vout"])
-            fee_sats = int(round((in_total - out_total) * 1e8))
+            fee_sats = g.get_fee_sats(txid)
             if fee_sats > 0:
                 fee_rates.append(fee_sats / tx["vsize"])
 
@@ -1068,13 +1150,12 @@ def detect_12_behavioral_fingerprint(g: TxGraph):
             )
 
     # 2. Consistent output count (always 2 outputs = simple spend pattern)
-    if output_counts:
-        avg_outs = sum(output_counts) / len(output_counts)
-        if all(c == output_counts[0] for c in output_counts) and len(output_counts) >= 3:
-            problems.append(
-                f"Uniform output count: all {len(output_counts)} send TXs have exactly "
-                f"{output_counts[0]} outputs. Consistent structure aids fingerprinting."
-            )
+    out_count_freq = Counter(output_counts)
+    if len(out_count_freq) == 1 and len(output_counts) >= 3:
+        problems.append(
+            f"Uniform output count: all {len(output_counts)} send TXs have exactly "
+            f"{output_counts[0]} outputs. Consistent structure aids fingerprinting."
+        )
 
     # 3. Script type consistency or mixing
     input_types_set = set(input_script_types)
@@ -1106,14 +1187,14 @@ def detect_12_behavioral_fingerprint(g: TxGraph):
             )
 
     # 5. Locktime pattern
-    if locktime_values:
-        nonzero_lt = [lt for lt in locktime_values if lt > 0]
-        if len(nonzero_lt) == len(locktime_values) and len(locktime_values) >= 3:
+    if len(locktime_values) >= 3:
+        zero_lt = Counter(locktime_values)[0]
+        if zero_lt == 0:
             problems.append(
                 "Anti-fee-sniping locktime always set — consistent with Bitcoin Core / Electrum. "
                 "Absence or presence of this reveals your wallet software."
             )
-        elif not nonzero_lt and len(locktime_values) >= 3:
+        elif zero_lt == len(locktime_values):
             problems.append(
                 "Locktime always 0 — no anti-fee-sniping. "
                 "This distinguishes your wallet from Bitcoin Core / Electrum defaults."
@@ -1133,19 +1214,18 @@ def detect_12_behavioral_fingerprint(g: TxGraph):
                 )
 
     # 7. Change address type pattern
-    if change_address_types_used and payment_address_types_used:
-        if change_address_types_used != payment_address_types_used:
+    if change_type_mask and payment_type_mask:
+        if change_type_mask != payment_type_mask:
             # This leaks which outputs are change
             problems.append(
-                f"Change uses different script type ({change_address_types_used}) "
-                f"than payments ({payment_address_types_used}) — trivially identifies change outputs."
+                f"Change uses different script type ({script_types_from_mask(change_type_mask)}) "
+                f"than payments ({script_types_from_mask(payment_type_mask)}) — trivially identifies change outputs."
             )
 
     # 8. Input count pattern (always 1 input = no consolidation; always many = distinctive)
-    if n_inputs_list and len(n_inputs_list) >= 3:
-        if all(n == 1 for n in n_inputs_list):
-            pass  # normal, not distinctive
-        elif all(n == n_inputs_list[0] for n in n_inputs_list) and n_inputs_list[0] > 1:
+    in_count_freq = Counter(n_inputs_list)
+    if len(in_count_freq) == 1 and len(n_inputs_list) >= 3:
+        if n_inputs_list[0] > 1:  # always 1 input is normal, not distinctive
             problems.append(
                 f"Always uses exactly {n_inputs_list[0]} inputs per TX — unusual and identifying."
             )
@@ -1205,7 +1285,7 @@ def main():
     descriptors = resolve_descriptors(args)
     info(f"Found {len(descriptors)} descriptors")
     for d in descriptors:
-        dtype = d["desc"].split("(")[0]
+        dtype = parse_descriptor(d["desc"])[1]
         role = "internal/change" if d["internal"] else "external/receive"
         info(f"  {dtype:15} {role:20} range [0..{d['range_end']}]")
 
@@ -1246,6 +1326,8 @@ def main():
     # ── Step 5: Build transaction graph ──
     g = TxGraph(addr_map, wallet_txs, utxos)
     info(f"Unique transaction IDs: {len(g.our_txids)}")
+    # Detectors read our txs and their direct parents (input addresses/amounts)
+    g.prefetch_ancestry(g.our_txids, depth=1)
 
     # ── Step 6: Run all detectors ──
     detect_01_address_reuse(g)
@@ -1261,7 +1343,7 @@ def main():
     detect_11_tainted_utxos(g, args.known_risky_wallets)
     detect_12_behavioral_fingerprint(g)
 
-    # ── JSON output ──
+    # ── JSON output (streamed straight to stdout) ──
     report = {
         "stats": {
             "transactions_analyzed": len(g.our_txids),
@@ -1275,7 +1357,8 @@ def main():
             "clean": len(FINDINGS) == 0 and len(WARNINGS) == 0,
         },
     }
-    print(json.dumps(report, indent=2))
+    json.dump(report, sys.stdout, indent=2)
+    sys.stdout.write("\n")
 
     # Cleanup
     if not args.wallet and not args.keep_scan_wallet:
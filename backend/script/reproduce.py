@@ -9,47 +9,135 @@ No detection logic — that lives in detect.py.
 Usage:
     python3 reproduce.py              # Create all 12 vulnerability scenarios
     python3 reproduce.py -k 3         # Create only vulnerability 3
+    python3 reproduce.py --jobs 1     # Run every scenario serially
+    python3 reproduce.py --fast       # Fund the 02/06 input sets with one sendmany each
+    QUIET=1 python3 reproduce.py      # Drop the ℹ progress notes, keep ✓ results
 """
 
 import sys
 import os
 import json
-import time
+import argparse
+import threading
+import traceback
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 from bitcoin_rpc import (
-    cli, mine_blocks, get_tx, get_utxos, get_balance,
-    get_new_address, send_to_address, create_raw_tx, sign_raw_tx,
-    send_raw, get_block_count, create_funded_psbt,
-    process_psbt, finalize_psbt,
+    cli, mine_blocks, get_tx, get_utxos, get_balance, has_balance,
+    get_new_address, get_new_addresses, send_to_address, create_raw_tx,
+    sign_and_send, send_raw, get_block_count, create_funded_psbt,
+    process_psbt, finalize_psbt, batch_cli, find_vout_for_addr,
 )
 
+POOL = ThreadPoolExecutor(max_workers=8)  # independent RPCs; each thread keeps its own connection
+_mine_lock = threading.Lock()  # block production stays globally ordered across scenarios
+FAST = False  # --fast: one sendmany per 02/06 funding group instead of one tx per output
+QUIET = bool(os.environ.get("QUIET"))
+
 # ═══════════════════════════════════════════════════════════════════════════════
 # Formatting helpers
 # ═══════════════════════════════════════════════════════════════════════════════
-G = "\033[92m"; Y = "\033[93m"; C = "\033[96m"; B = "\033[1m"; R = "\033[0m"
+G = "\033[92m"; Y = "\033[93m"; E = "\033[91m"; C = "\033[96m"; B = "\033[1m"; R = "\033[0m"
+if not sys.stdout.isatty():
+    # Piped or redirected (CI logs): no escape codes
+    G = Y = E = C = B = R = ""
+_RULE = "═" * 78
+_BOLD_RULE = f"{B}{_RULE}{R}"
+_OK = f"  {G}✓{R} "
+_INFO = f"  {Y}ℹ{R} "
+
+# Scenarios run side by side collect their lines here so output stays in scenario order
+_out = threading.local()
+
+def emit(line):
+    buf = getattr(_out, "lines", None)
+    if buf is None:
+        print(line)
+    else:
+        buf.append(line)
 
 def header(num, title):
-    print(f"\n{'═'*78}")
-    print(f"{B}{C}  REPRODUCE {num}: {title}{R}")
-    print(f"{'═'*78}")
+    emit(f"\n{_RULE}\n{B}{C}  REPRODUCE {num}: {title}{R}\n{_RULE}")
 
 def ok(msg):
-    print(f"  {G}✓{R} {msg}")
+    emit(_OK + msg)
+
+if QUIET:
+    def info(msg):
+        pass
+else:
+    def info(msg):
+        emit(_INFO + msg)
 
-def info(msg):
-    print(f"  {Y}ℹ{R} {msg}")
+def btc(sat_amount):
+    """Integer satoshis → exact 8-decimal BTC string, accepted by RPC amount params."""
+    return f"{sat_amount // 100_000_000}.{sat_amount % 100_000_000:08d}"
 
 def ensure_funds(wallet, min_btc=0.5):
-    bal = get_balance(wallet)
-    if bal < min_btc:
-        addr = get_new_address(wallet, "bech32")
-        send_to_address("miner", addr, min_btc + 0.5)
-        mine_blocks(1)
+    ensure_funds_many({wallet: min_btc})
+
+def ensure_funds_many(needs):
+    """Top up every {wallet: min_btc} that is short: balances probed concurrently, one sendmany, one block."""
+    wallets = list(needs)
+    short = [w for w, ok in zip(wallets, POOL.map(has_balance, wallets, [needs[w] for w in wallets])) if not ok]
+    if short:
+        # One miner transaction pays every short wallet
+        addrs = POOL.map(get_new_address, short)
+        cli("sendmany", "", {a: f"{needs[w] + 0.5:.8f}" for w, a in zip(short, addrs)}, wallet="miner")
+        mine(1)
+
+def fund_addresses(wallet, amounts, separate=False):
+    """Pay {address: btc string} from `wallet`; return the funding txid for each address, in order.
+
+    One transaction per output by default, a single sendmany under --fast.
+    `separate` keeps one transaction per output even under --fast, for
+    scenarios whose point is the number of transactions.
+    """
+    if FAST and not separate:
+        return [cli("sendmany", "", amounts, wallet=wallet)] * len(amounts)
+    return batch_cli([("sendtoaddress", [a, v]) for a, v in amounts.items()], wallet=wallet)
+
+def mine(n=1):
+    with _mine_lock:
+        mine_blocks(n)
 
 def mine_and_confirm():
-    mine_blocks(1)
-    time.sleep(0.5)
+    """Mine a block that confirms everything in the mempool.
+
+    generatetoaddress returns once the block is connected, and wallet RPCs
+    wait for the wallet to catch up with the tip, so no polling is needed.
+    """
+    mine(1)
+
+def first_dust_and_normal(utxos):
+    """First dust (≤ 1000 sats) and first normal (> 100k sats) UTXO, in a single pass."""
+    dust = normal = None
+    for u in utxos:
+        if dust is None and u["sats"] <= 1000:
+            dust = u
+        elif normal is None and u["sats"] > 100_000:
+            normal = u
+        if dust and normal:
+            break
+    return dust, normal
+
+def sweep(wallet, utxos, dest):
+    """Spend exactly `utxos` to a single `dest` output, with bitcoind deducting the fee from it."""
+    # One pass: trimmed outpoints for the RPC plus the total, in satoshis
+    inputs, total = [], 0
+    for u in utxos:
+        inputs.append({"txid": u["txid"], "vout": u["vout"]})
+        total += u["sats"]
+    psbt_result = create_funded_psbt(
+        wallet, inputs, [{dest: btc(total)}],
+        {"subtractFeeFromOutputs": [0], "add_inputs": False}
+    )
+    signed = process_psbt(wallet, psbt_result["psbt"])
+    # walletprocesspsbt already finalizes and extracts a complete PSBT (Core 26+)
+    hex_tx = signed.get("hex") or finalize_psbt(signed["psbt"])["hex"]
+    return send_raw(hex_tx)
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 1. Address Reuse
@@ -58,8 +146,8 @@ def reproduce_01():
     header(1, "Address Reuse")
     ensure_funds("bob", 1.0)
     reused_addr = get_new_address("alice", "bech32")
-    txid1 = send_to_address("bob", reused_addr, 0.01)
-    txid2 = send_to_address("bob", reused_addr, 0.02)
+    txid1, txid2 = batch_cli([("sendtoaddress", [reused_addr, btc(1_000_000)]),
+                              ("sendtoaddress", [reused_addr, btc(2_000_000)])], wallet="bob")
     mine_and_confirm()
     ok(f"Sent to same address {reused_addr} twice: TX {txid1[:16]}… and {txid2[:16]}…")
 
@@ -69,26 +157,16 @@ def reproduce_01():
 def reproduce_02():
     header(2, "Multi-input / CIOH (Common Input Ownership Heuristic)")
     ensure_funds("bob", 2.0)
-    for _ in range(5):
-        addr = get_new_address("alice", "bech32")
-        send_to_address("bob", addr, 0.005)
-    mine_and_confirm()
+    addrs = get_new_addresses("alice", 5)
+    txids = fund_addresses("bob", dict.fromkeys(addrs, btc(500_000)))
 
-    utxos = get_utxos("alice", 1)
-    small = [u for u in utxos if 0.004 < u["amount"] < 0.006][:5]
+    # Spend the fresh outputs straight from the mempool; one block confirms everything
+    small = [u for u in POOL.map(find_vout_for_addr, txids, addrs) if u]
     if len(small) < 2:
         info("Not enough small UTXOs, skipping consolidation step")
         return
-    inputs = [{"txid": u["txid"], "vout": u["vout"]} for u in small]
     dest = get_new_address("bob", "bech32")
-    total = sum(u["amount"] for u in small)
-    psbt_result = create_funded_psbt(
-        "alice", inputs, [{dest: round(total - 0.001, 8)}],
-        {"subtractFeeFromOutputs": [0], "add_inputs": False}
-    )
-    signed = process_psbt("alice", psbt_result["psbt"])
-    final = finalize_psbt(signed["psbt"])
-    txid = send_raw(final["hex"])
+    txid = sweep("alice", small, dest)
     mine_and_confirm()
     ok(f"Consolidated {len(small)} inputs in TX {txid[:16]}… (CIOH trigger)")
 
@@ -100,16 +178,15 @@ def reproduce_03():
     ensure_funds("bob", 1.0)
     dust1 = get_new_address("alice", "bech32")
     dust2 = get_new_address("alice", "bech32")
-    bob_utxos = get_utxos("bob", 1)
-    big = max(bob_utxos, key=lambda u: u["amount"])
+    # Let bitcoind pick any one UTXO large enough to fund the dust + change
+    big = get_utxos("bob", 1, min_amount=0.01, max_count=1)[0]
     change = get_new_address("bob", "bech32")
-    change_amt = round(big["amount"] - 0.00001000 - 0.00000546 - 0.0001, 8)
+    change_amt = btc(big["sats"] - 1000 - 546 - 10_000)
     raw = create_raw_tx(
         [{"txid": big["txid"], "vout": big["vout"]}],
-        [{dust1: 0.00001000}, {dust2: 0.00000546}, {change: change_amt}]
+        [{dust1: btc(1000)}, {dust2: btc(546)}, {change: change_amt}]
     )
-    signed = sign_raw_tx("bob", raw)
-    txid = send_raw(signed["hex"])
+    txid = sign_and_send("bob", raw)
     mine_and_confirm()
     ok(f"Created 1000-sat and 546-sat dust outputs to Alice in TX {txid[:16]}…")
 
@@ -119,47 +196,36 @@ def reproduce_03():
 def reproduce_04():
     header(4, "Spending Dust with Normal Inputs")
     ensure_funds("alice", 0.5)
-    utxos = get_utxos("alice", 1)
-    dust_utxos = [u for u in utxos if u["amount"] <= 0.00001]
-    normal_utxos = [u for u in utxos if u["amount"] > 0.001]
+    dust, normal = first_dust_and_normal(get_utxos("alice", 1))
 
-    if not dust_utxos:
+    if not dust:
         info("No dust UTXOs, creating one first…")
         ensure_funds("bob", 1.0)
         a = get_new_address("alice", "bech32")
-        bu = get_utxos("bob", 1)
-        big = max(bu, key=lambda u: u["amount"])
+        big = get_utxos("bob", 1, min_amount=0.01, max_count=1)[0]
         ch = get_new_address("bob", "bech32")
         raw = create_raw_tx(
             [{"txid": big["txid"], "vout": big["vout"]}],
-            [{a: 0.00001000}, {ch: round(big["amount"] - 0.00001 - 0.0001, 8)}]
+            [{a: btc(1000)}, {ch: btc(big["sats"] - 1000 - 10_000)}]
         )
-        signed = sign_raw_tx("bob", raw)
-        send_raw(signed["hex"])
-        mine_and_confirm()
-        utxos = get_utxos("alice", 1)
-        dust_utxos = [u for u in utxos if u["amount"] <= 0.00001]
-        normal_utxos = [u for u in utxos if u["amount"] > 0.001]
-
-    if not normal_utxos:
+        # Output 0 is the dust: no need to list Alice's wallet to find it,
+        # and it can be spent straight from the mempool
+        dust = {"txid": sign_and_send("bob", raw), "vout": 0, "sats": 1000}
+    if not normal:
         ensure_funds("alice", 0.5)
         mine_and_confirm()
-        utxos = get_utxos("alice", 1)
-        normal_utxos = [u for u in utxos if u["amount"] > 0.001]
+        normal = get_utxos("alice", 1, min_amount=0.00100001, max_count=1)[0]
 
-    dust = dust_utxos[0]
-    normal = normal_utxos[0]
     dest = get_new_address("bob", "bech32")
-    total = dust["amount"] + normal["amount"]
+    total = dust["sats"] + normal["sats"]
     raw = create_raw_tx(
         [{"txid": dust["txid"], "vout": dust["vout"]},
          {"txid": normal["txid"], "vout": normal["vout"]}],
-        [{dest: round(total - 0.0001, 8)}]
+        [{dest: btc(total - 10_000)}]
     )
-    signed = sign_raw_tx("alice", raw)
-    txid = send_raw(signed["hex"])
+    txid = sign_and_send("alice", raw)
     mine_and_confirm()
-    ok(f"Spent dust ({int(dust['amount']*1e8)} sats) + normal ({normal['amount']:.8f}) together in TX {txid[:16]}…")
+    ok(f"Spent dust ({dust['sats']} sats) + normal ({btc(normal['sats'])}) together in TX {txid[:16]}…")
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 5. Change Detection
@@ -178,44 +244,24 @@ def reproduce_05():
 def reproduce_06():
     header(6, "Consolidation Origin")
     ensure_funds("bob", 2.0)
-    for _ in range(4):
-        addr = get_new_address("alice", "bech32")
-        send_to_address("bob", addr, 0.003)
-    mine_and_confirm()
-
-    utxos = get_utxos("alice", 1)
-    small = [u for u in utxos if 0.002 < u["amount"] < 0.004][:4]
+    *addrs, consol_addr = get_new_addresses("alice", 5)
+    txids = fund_addresses("bob", dict.fromkeys(addrs, btc(300_000)))
+    small = [u for u in POOL.map(find_vout_for_addr, txids, addrs) if u]
     if len(small) < 3:
-        info(f"Only {len(small)} small UTXOs, creating more…")
-        for _ in range(4):
-            addr = get_new_address("alice", "bech32")
-            send_to_address("bob", addr, 0.003)
-        mine_and_confirm()
-        utxos = get_utxos("alice", 1)
-        small = [u for u in utxos if 0.002 < u["amount"] < 0.004][:4]
-
-    inputs = [{"txid": u["txid"], "vout": u["vout"]} for u in small]
-    consol_addr = get_new_address("alice", "bech32")
-    total = sum(u["amount"] for u in small)
-    raw = create_raw_tx(inputs, [{consol_addr: round(total - 0.0001, 8)}])
-    signed = sign_raw_tx("alice", raw)
-    consol_txid = send_raw(signed["hex"])
-    mine_and_confirm()
+        raise RuntimeError(f"only {len(small)} of {len(addrs)} funding outputs found; need ≥3 small UTXOs to consolidate")
+
+    consol_txid = sweep("alice", small, consol_addr)
     ok(f"Consolidated {len(small)} UTXOs → 1 in TX {consol_txid[:16]}…")
 
-    # Now spend the consolidated output
-    utxos = get_utxos("alice", 1)
-    cu = [u for u in utxos if u["txid"] == consol_txid]
-    if cu:
-        dest = get_new_address("carol", "bech32")
-        raw = create_raw_tx(
-            [{"txid": cu[0]["txid"], "vout": cu[0]["vout"]}],
-            [{dest: round(cu[0]["amount"] - 0.0001, 8)}]
-        )
-        signed = sign_raw_tx("alice", raw)
-        txid2 = send_raw(signed["hex"])
-        mine_and_confirm()
-        ok(f"Spent consolidated UTXO in TX {txid2[:16]}… — carries full cluster history")
+    # Chain the whole scenario in the mempool (funding, consolidation and this
+    # spend), so one block confirms all three transactions
+    cu = find_vout_for_addr(consol_txid, consol_addr)
+    if cu is None:
+        raise RuntimeError(f"consolidation output to {consol_addr} not found in TX {consol_txid}")
+    dest = get_new_address("carol", "bech32")
+    txid2 = sweep("alice", [cu], dest)
+    ok(f"Spent consolidated UTXO in TX {txid2[:16]}… — carries full cluster history")
+    mine_and_confirm()
 
 # ═══════════════════════════════════════════════════════════════════════════════
 # 7. Script Type Mixing
@@ -223,31 +269,23 @@ def reproduce_06():
 def reproduce_07():
     header(7, "Script Type Mixing")
     ensure_funds("bob", 2.0)
-    wpkh = get_new_address("alice", "bech32")
-    tr = get_new_address("alice", "bech32m")
-    send_to_address("bob", wpkh, 0.005)
-    send_to_address("bob", tr, 0.005)
-    mine_and_confirm()
+    wpkh, tr = batch_cli([("getnewaddress", ["", "bech32"]), ("getnewaddress", ["", "bech32m"])], wallet="alice")
+    txids = batch_cli([("sendtoaddress", [wpkh, btc(500_000)]), ("sendtoaddress", [tr, btc(500_000)])],
+                      wallet="bob")
 
-    utxos = get_utxos("alice", 1)
-    def is_wpkh(addr):
-        return addr and not addr.startswith(("tb1p","bc1p","bcrt1p")) and addr.startswith(("tb1q","bc1q","bcrt1q"))
-    def is_tr(addr):
-        return addr and addr.startswith(("tb1p","bc1p","bcrt1p"))
-    wu = next((u for u in utxos if is_wpkh(u.get("address","")) and u["amount"] >= 0.004), None)
-    tu = next((u for u in utxos if is_tr(u.get("address","")) and u["amount"] >= 0.004), None)
+    # Spend both outputs straight from the mempool; one block confirms everything
+    wu, tu = POOL.map(find_vout_for_addr, txids, (wpkh, tr))
     if not wu or not tu:
         info("Could not find both UTXO types")
         return
     dest = get_new_address("bob", "bech32")
-    total = wu["amount"] + tu["amount"]
+    total = wu["sats"] + tu["sats"]
     raw = create_raw_tx(
         [{"txid": wu["txid"], "vout": wu["vout"]},
          {"txid": tu["txid"], "vout": tu["vout"]}],
-        [{dest: round(total - 0.0002, 8)}]
+        [{dest: btc(total - 20_000)}]
     )
-    signed = sign_raw_tx("alice", raw)
-    txid = send_raw(signed["hex"])
+    txid = sign_and_send("alice", raw)
     mine_and_confirm()
     ok(f"Mixed P2WPKH + P2TR inputs in TX {txid[:16]}… — script type fingerprint")
 
@@ -256,31 +294,19 @@ def reproduce_07():
 # ═══════════════════════════════════════════════════════════════════════════════
 def reproduce_08():
     header(8, "Cluster Merge")
-    ensure_funds("bob", 2.0)
-    ensure_funds("carol", 2.0)
-    a_addr = get_new_address("alice", "bech32")
-    b_addr = get_new_address("alice", "bech32")
-    txid_a = send_to_address("bob", a_addr, 0.004)
-    txid_b = send_to_address("carol", b_addr, 0.004)
-    mine_and_confirm()
-
-    utxos = get_utxos("alice", 1)
-    ua = next((u for u in utxos if u["txid"] == txid_a), None)
-    ub = next((u for u in utxos if u["txid"] == txid_b), None)
-    if not ua: ua = next((u for u in utxos if u.get("address") == a_addr), None)
-    if not ub: ub = next((u for u in utxos if u.get("address") == b_addr), None)
+    ensure_funds_many({"bob": 2.0, "carol": 2.0})
+    a_addr, b_addr = get_new_addresses("alice", 2)
+    # Different source wallets, so the two funding sends can overlap
+    txid_a, txid_b = POOL.map(send_to_address, ("bob", "carol"), (a_addr, b_addr), (0.004, 0.004))
+
+    # Read the two funding txs instead of listing Alice's whole wallet, and
+    # spend them straight from the mempool; one block confirms everything
+    ua, ub = POOL.map(find_vout_for_addr, (txid_a, txid_b), (a_addr, b_addr))
     if not ua or not ub:
         info("Could not find both cluster UTXOs")
         return
     dest = get_new_address("bob", "bech32")
-    total = ua["amount"] + ub["amount"]
-    raw = create_raw_tx(
-        [{"txid": ua["txid"], "vout": ua["vout"]},
-         {"txid": ub["txid"], "vout": ub["vout"]}],
-        [{dest: round(total - 0.0002, 8)}]
-    )
-    signed = sign_raw_tx("alice", raw)
-    txid = send_raw(signed["hex"])
+    txid = sweep("alice", [ua, ub], dest)
     mine_and_confirm()
     ok(f"Merged Bob-cluster and Carol-cluster UTXOs in TX {txid[:16]}…")
 
@@ -289,10 +315,9 @@ def reproduce_08():
 # ═══════════════════════════════════════════════════════════════════════════════
 def reproduce_09():
     header(9, "Lookback Depth / UTXO Age")
-    old_addr = get_new_address("alice", "bech32")
+    old_addr, new_addr = get_new_addresses("alice", 2)
     send_to_address("miner", old_addr, 0.01)
-    mine_blocks(20)
-    new_addr = get_new_address("alice", "bech32")
+    mine(20)
     send_to_address("miner", new_addr, 0.01)
     mine_and_confirm()
     ok(f"Created old UTXO (20+ blocks ago) and new UTXO (just now) for Alice")
@@ -305,10 +330,15 @@ def reproduce_10():
     ensure_funds("exchange", 5.0)
     batch = {}
     wallets = ["alice", "bob", "carol", "alice", "bob", "carol", "alice", "bob"]
-    for i in range(8):
-        addr = get_new_address(wallets[i], "bech32")
-        batch[addr] = round(0.01 + i * 0.001, 8)
-    txid = cli("sendmany", "", json.dumps(batch), wallet="exchange")
+    # One address batch per recipient wallet (a JSON-RPC batch targets one wallet),
+    # with the per-wallet batches issued concurrently
+    def alloc(w):
+        idx = [i for i, name in enumerate(wallets) if name == w]
+        return idx, get_new_addresses(w, len(idx))
+    for idx, addrs in POOL.map(alloc, dict.fromkeys(wallets)):
+        for i, addr in zip(idx, addrs):
+            batch[addr] = btc(1_000_000 + i * 100_000)
+    txid = cli("sendmany", "", batch, wallet="exchange")
     mine_and_confirm()
     ok(f"Exchange batch withdrawal to 8 recipients in TX {txid[:16]}…")
 
@@ -317,31 +347,17 @@ def reproduce_10():
 # ═══════════════════════════════════════════════════════════════════════════════
 def reproduce_11():
     header(11, "Tainted UTXOs / Dirty Money")
-    ensure_funds("risky", 2.0)
-    ensure_funds("bob", 1.0)
-    ta = get_new_address("alice", "bech32")
-    taint_txid = send_to_address("risky", ta, 0.01)
-    ca = get_new_address("alice", "bech32")
-    clean_txid = send_to_address("bob", ca, 0.01)
-    mine_and_confirm()
+    ensure_funds_many({"risky": 2.0, "bob": 1.0})
+    ta, ca = get_new_addresses("alice", 2)
+    taint_txid, clean_txid = POOL.map(send_to_address, ("risky", "bob"), (ta, ca), (0.01, 0.01))
 
-    utxos = get_utxos("alice", 1)
-    tu = next((u for u in utxos if u["txid"] == taint_txid), None)
-    cu = next((u for u in utxos if u["txid"] == clean_txid), None)
-    if not tu: tu = next((u for u in utxos if u.get("address") == ta), None)
-    if not cu: cu = next((u for u in utxos if u.get("address") == ca), None)
+    # Spend both straight from the mempool; one block confirms everything
+    tu, cu = POOL.map(find_vout_for_addr, (taint_txid, clean_txid), (ta, ca))
     if not tu or not cu:
         info("Could not locate tainted + clean UTXOs")
         return
     dest = get_new_address("carol", "bech32")
-    total = tu["amount"] + cu["amount"]
-    raw = create_raw_tx(
-        [{"txid": tu["txid"], "vout": tu["vout"]},
-         {"txid": cu["txid"], "vout": cu["vout"]}],
-        [{dest: round(total - 0.0002, 8)}]
-    )
-    signed = sign_raw_tx("alice", raw)
-    txid = send_raw(signed["hex"])
+    txid = sweep("alice", [tu, cu], dest)
     mine_and_confirm()
     ok(f"Merged tainted + clean UTXOs in TX {txid[:16]}… — taint propagation")
 
@@ -350,22 +366,25 @@ def reproduce_11():
 # ═══════════════════════════════════════════════════════════════════════════════
 def reproduce_12():
     header(12, "Behavioral Fingerprinting")
-    ensure_funds("alice", 3.0)
-    ensure_funds("bob", 3.0)
+    ensure_funds_many({"alice": 3.0, "bob": 3.0})
 
-    info("Alice's pattern: round amounts, always bech32…")
-    for i in range(5):
-        dest = get_new_address("carol", "bech32")
-        send_to_address("alice", dest, 0.01 * (i + 1))
+    # All ten of Carol's receive addresses in one batch: 5 for Alice, then 5 for Bob
+    atypes = ["bech32"] * 5 + ["bech32m" if i % 2 == 0 else "bech32" for i in range(5)]
+    dests = batch_cli([("getnewaddress", ["", t]) for t in atypes], wallet="carol")
 
-    mine_and_confirm()
+    # The txids are never needed: submit both wallets' sends without waiting.
+    # Each payment stays its own tx even under --fast: detect_12 needs ≥3 send txs per wallet
+    info("Alice's pattern: round amounts, always bech32…")
+    alice_sends = POOL.submit(
+        fund_addresses, "alice", {dests[i]: btc(1_000_000 * (i + 1)) for i in range(5)}, True)
 
     info("Bob's pattern: odd amounts, mixed address types…")
-    for i in range(5):
-        atype = "bech32m" if i % 2 == 0 else "bech32"
-        dest = get_new_address("carol", atype)
-        send_to_address("bob", dest, round(0.00723 * (i + 1) + 0.00011, 8))
+    bob_sends = POOL.submit(
+        fund_addresses, "bob", {dests[5 + i]: btc(723_000 * (i + 1) + 11_000) for i in range(5)}, True)
 
+    # Only block on the futures to surface RPC errors before mining
+    alice_sends.result()
+    bob_sends.result()
     mine_and_confirm()
     ok("Created distinguishable behavioral patterns for Alice and Bob")
 
@@ -388,31 +407,99 @@ ALL = [
     (12, "Behavioral Fingerprint", reproduce_12),
 ]
 
-def main():
-    filt = None
-    if "-k" in sys.argv:
-        idx = sys.argv.index("-k")
-        if idx + 1 < len(sys.argv):
-            filt = sys.argv[idx + 1]
+# Per-scenario ensure_funds thresholds. main() tops up their sum once before the
+# run, so the scenarios' own checks normally find enough and send/mine nothing
+# (they still guard against a scenario sweeping a whole large UTXO away).
+FUNDING = {
+    1: {"bob": 1.0},
+    2: {"bob": 2.0},
+    3: {"bob": 1.0},
+    4: {"alice": 0.5, "bob": 1.0},
+    5: {"alice": 1.0},
+    6: {"bob": 2.0},
+    7: {"bob": 2.0},
+    8: {"bob": 2.0, "carol": 2.0},
+    10: {"exchange": 5.0},
+    11: {"risky": 2.0, "bob": 1.0},
+    12: {"alice": 3.0, "bob": 3.0},
+}
+
+# Scenarios that only spend through wallet coin selection (bob, miner, exchange),
+# so they can run concurrently with each other. Later scenarios do hand-pick
+# Alice's UTXOs (04 takes any >100k-sat one), so the group runs in the slot of
+# its last member: no scenario that used to run after any member runs before it.
+# Everything else lists and spends specific UTXOs, so it runs serially in order.
+CONCURRENT = {1, 9, 10}
+
+def run_scenario(name, fn, buffered=False):
+    """Run one scenario; when buffered, return its (output lines, traceback or None)."""
+    _out.lines = [] if buffered else None
+    tb = None
+    try:
+        fn()
+    except Exception as e:
+        emit(f"  {E}✗ ERROR in {name}: {e}{R}")
+        if buffered:
+            tb = traceback.format_exc()
+        else:
+            traceback.print_exc()
+    lines, _out.lines = _out.lines, None
+    return lines, tb
 
-    print(f"\n{B}{'═'*78}{R}")
+def main():
+    global FAST
+    parser = argparse.ArgumentParser(
+        description="Create on-chain transactions that exhibit Bitcoin privacy vulnerabilities.",
+        epilog="Examples:\n"
+               "  python3 reproduce.py -k 3\n"
+               "  python3 reproduce.py --jobs 1 --fast\n",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    parser.add_argument("-k", dest="filt", metavar="N", help="Only create vulnerability N")
+    parser.add_argument("--jobs", type=int, default=8,
+                        help="Workers for the independent scenarios (1 = run every scenario serially)")
+    parser.add_argument("--fast", action="store_true",
+                        help="Fund the 02/06 input sets with one sendmany each "
+                             "(scenario 12 keeps one tx per payment)")
+    args = parser.parse_args()
+    FAST = args.fast
+    filt = args.filt
+    jobs = max(1, args.jobs)
+
+    print(f"\n{_BOLD_RULE}")
     print(f"{B}{C}  REPRODUCE — Bitcoin Privacy Vulnerabilities{R}")
-    print(f"{B}{C}  Custom Signet — {get_block_count()} blocks{R}")
-    print(f"{B}{'═'*78}{R}")
-
-    for num, name, fn in ALL:
-        if filt and str(num) != filt:
+    tip = get_block_count()
+    print(f"{B}{C}  Custom Signet — {tip} blocks{R}")
+    print(_BOLD_RULE)
+
+    selected = [(num, name, fn) for num, name, fn in ALL if not filt or str(num) == filt]
+    budget = Counter()
+    for num, _, _ in selected:
+        budget.update(FUNDING.get(num, {}))
+    ensure_funds_many(budget)
+
+    group = [(num, name, fn) for num, name, fn in selected if num in CONCURRENT]
+    if len(group) < 2 or jobs < 2:
+        group = []
+    for num, name, fn in selected:
+        if group and num in CONCURRENT:
+            if num != group[-1][0]:
+                continue
+            # Own executor: scenarios submit to POOL themselves
+            with ThreadPoolExecutor(max_workers=min(jobs, len(group))) as ex:
+                futures = [ex.submit(run_scenario, gname, gfn, True) for _, gname, gfn in group]
+            for f in futures:
+                lines, tb = f.result()
+                print("\n".join(lines))
+                if tb:
+                    sys.stderr.write(tb)
             continue
-        try:
-            fn()
-        except Exception as e:
-            print(f"  \033[91m✗ ERROR in {name}: {e}\033[0m")
-            import traceback; traceback.print_exc()
+        run_scenario(name, fn)
 
-    print(f"\n{B}{'═'*78}{R}")
+    print(f"\n{_BOLD_RULE}")
     print(f"  {G}Done. All vulnerability scenarios have been created on-chain.{R}")
     print(f"  Now run: python3 detect.py <descriptor>")
-    print(f"{B}{'═'*78}{R}\n")
+    print(f"{_BOLD_RULE}\n")
 
 if __name__ == "__main__":
     main()
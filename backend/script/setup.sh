@@ -85,41 +85,46 @@ bitcoind -daemon \
   -acceptnonstdtxn=1
 ok "bitcoind launched"
 
-# Wait for RPC to become ready
-echo -n "  … waiting for RPC"
-for i in $(seq 1 30); do
-  sleep 1
-  echo -n "."
-  if bcli getblockchaininfo > /dev/null 2>&1; then
-    echo ""
-    ok "RPC ready after ${i}s"
-    break
-  fi
-  if [[ $i -eq 30 ]]; then
-    echo ""
-    err "bitcoind did not respond within 30s — check logs at ${REGTEST_DIR}/debug.log"
-  fi
-done
+# Wait for RPC to become ready: -rpcwait makes bitcoin-cli retry until bitcoind
+# answers (past warmup), with no up-front sleep, and the same call reads the height
+echo "  … waiting for RPC"
+START=$SECONDS
+if ! BLOCKS=$(bcli -rpcwait -rpcwaittimeout=30 getblockcount 2>/dev/null); then
+  err "bitcoind did not respond within 30s — check logs at ${REGTEST_DIR}/debug.log"
+fi
+ok "RPC ready after $(( SECONDS - START ))s"
 
-BLOCKS=$(bcli getblockcount)
 info "Chain height: ${BLOCKS} blocks"
 
 # ─── 4. Create / load wallets ─────────────────────────────────────────────────
 echo ""
 echo -e "${B}Step 4: Create wallets${RST}"
-for w in "${WALLETS[@]}"; do
-  if bcli createwallet "$w" 2>/dev/null | grep -q '"name"'; then
+# One listwallets call up front instead of probing each wallet
+LOADED=$(bcli listwallets)
+setup_wallet() {
+  local w="$1"
+  if grep -q "\"${w}\"" <<< "$LOADED"; then
+    info "Wallet already loaded: ${w}"
+  elif bcli loadwallet "$w" 2>/dev/null | grep -q '"name"'; then
+    # Wallet DB already exists on disk
+    ok "Loaded existing wallet: ${w}"
+  elif bcli createwallet "$w" 2>/dev/null | grep -q '"name"'; then
     ok "Created wallet: ${w}"
   else
-    # Wallet DB already exists on disk — just load it
-    if bcli loadwallet "$w" 2>/dev/null | grep -q '"name"'; then
-      ok "Loaded existing wallet: ${w}"
-    else
-      # Already loaded (returned error -35)
-      info "Wallet already loaded: ${w}"
-    fi
+    info "Could not load or create wallet: ${w} (check ${REGTEST_DIR}/debug.log)"
   fi
+}
+# Wallets are independent, so load/create them concurrently; each job writes
+# to its own file and the results are printed back in WALLETS order
+WALLET_LOG=$(mktemp -d)
+for w in "${WALLETS[@]}"; do
+  setup_wallet "$w" > "${WALLET_LOG}/${w}" &
+done
+wait
+for w in "${WALLETS[@]}"; do
+  cat "${WALLET_LOG}/${w}"
 done
+rm -rf "$WALLET_LOG"
 
 # ─── 5. Mine initial blocks (only if fresh or chain has <110 blocks) ──────────
 echo ""